@@ -13,7 +13,9 @@ DEF_FREQ = 600                  # Default delay between uploads in seconds
 DEF_DELAY = 300                 # Default delay before first upload in seconds
 DEF_WAIT = 1                    # Default delay between sensor reads
 DEF_THROTTLE = 120              # Default additional delay on 'ThrottlingError'
+DEF_THROTTLE_BASE = 1.3         # Default growth factor for additional delay on repeated 'ThrottlingError'
 DEF_ROUNDING = 2                # Default 'rounding' precision for uploaded data
+DEF_UPLOAD_DELTA = 0.02         # Default min relative change for a value to be uploaded (0 = upload all)
 # fmt: on
 
 
@@ -24,12 +26,19 @@ KWD_FREQ = 'FREQ'
 KWD_DELAY = 'DELAY'
 KWD_WAIT = 'WAIT'
 KWD_THROTTLE = 'THROTTLE'
+KWD_THROTTLE_BASE = 'THROTTLE_BASE'
 KWD_ROUNDING = 'ROUNDING'
+KWD_UPLOAD_DELTA = 'UPLOAD_DELTA'
+
+# -- Support for Adafruit IO --
+KWD_AIO_ID = 'AIO_ID'
+KWD_AIO_KEY = 'AIO_KEY'
 
 # -- Support for internet speed data --
 KWD_FEED_DWNLD = 'FEED_DWNLD'
 KWD_FEED_UPLD = 'FEED_UPLD'
 KWD_FEED_PING = 'FEED_PING'
+KWD_FEED_GROUP = 'FEED_GROUP'
 
 KWD_DATA_DWNLD = 'download'
 KWD_DATA_UPLD = 'upload'
@@ -45,5 +54,6 @@ DISPL_PING = KWD_DATA_PING      # Display ping response time
 
 # -- SpeedTest --
 MBITS_PER_SEC = 1048576         # 1 MB = 1024 * 1024
+MBITS_FACTOR = 1 / MBITS_PER_SEC  # Multiply by this to convert bits/sec to MB/sec
 MAX_SPEED_MB = 3000             # Max Download speed = 3 Gbps = 3,000 Mbps
 # fmt: on
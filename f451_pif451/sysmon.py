@@ -46,9 +46,12 @@ import time
 import sys
 import asyncio
 import contextlib
+import inspect
 import platform
+import threading
 
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 
 from . import constants as const
@@ -64,16 +67,18 @@ import f451_sensehat.sensehat as f451SenseHat
 from rich.console import Console
 from rich.live import Live
 
-from Adafruit_IO import RequestError, ThrottlingError
+from Adafruit_IO import Client, RequestError, ThrottlingError
+from requests.exceptions import ConnectionError as NetworkError, Timeout as NetworkTimeout
 import speedtest
 
 # Install Rich 'traceback' and 'pprint' to
 # make (debug) life is easier. Trust me!
+#
+# NOTE: Rich 'traceback' is installed in 'main()' as we
+#       only want to show local vars in 'debug' mode.
 from rich.pretty import pprint
 from rich.traceback import install as install_rich_traceback
 
-install_rich_traceback(show_locals=True)
-
 
 # fmt: off
 # =========================================================
@@ -84,12 +89,17 @@ APP_NAME = 'f451 Labs - SysMon'
 APP_NAME_SHORT = 'SysMon'
 APP_LOG = 'f451-sysmon.log'         # Individual logs for devices with multiple apps
 APP_SETTINGS = 'settings.toml'      # Standard for all f451 Labs projects
+APP_TIME_FMT = '%a %b %-d, %Y at %-I:%M:%S %p'  # Format for human-readable time stamps
 
 APP_MIN_SPEEDTEST_WAIT = 300        # Min wait in sec between speed test runs
+APP_BEST_SERVER_TTL = 3600          # Wait in sec before we look for new best speed test server
+APP_SPEEDTEST_CLIENT_TTL = 10800    # Wait in sec before we reload speed test config and servers
 APP_MIN_PROG_WAIT = 1               # Remaining min (loop) wait time to display prog bar
 APP_WAIT_1SEC = 1
 APP_MAX_DATA = 120                  # Max number of data points in the queue
 APP_DELTA_FACTOR = 0.02             # Any change within X% is considered negligable
+APP_UPLOAD_ATTEMPTS = 3             # Max attempts per upload on network errors
+APP_MAX_UPLOAD_DELAY = 3600         # Max delay in sec between uploads on repeated 'ThrottlingError'
 
 APP_DATA_TYPES = [
     const.KWD_DATA_DWNLD,           # 'download' speed
@@ -97,12 +107,24 @@ APP_DATA_TYPES = [
     const.KWD_DATA_PING             # 'ping' response time
 ]
 
+APP_DATA_LABELS = {                 # Short labels for log messages
+    const.KWD_DATA_DWNLD: 'DWN',
+    const.KWD_DATA_UPLD: 'UP',
+    const.KWD_DATA_PING: 'PING',
+}
+
 APP_DISPL_MODES = [
     const.DISPL_DWNLD,              # Display download speed
     const.DISPL_UPLD,               # Display upload speed
     const.DISPL_PING,               # Display ping response time
 ]
 
+APP_DISPL_DATA = {                  # Data series (i.e. 'SystemData' attribute) for each display mode
+    const.DISPL_DWNLD: 'download',
+    const.DISPL_UPLD: 'upload',
+    const.DISPL_PING: 'ping',
+}
+
 COLOR_LOGO_FG = (255, 0, 0)
 COLOR_LOGO_BG = (67, 70, 75)
 
@@ -115,21 +137,149 @@ class SpeedTest:
     list of the app object.
     """
     def __init__(self, *args, **kwargs):
-        self._client = speedtest.Speedtest(secure=True)
+        self._client = None
+        self._clientTime = None
+        self._bestServerTime = None
 
     def get_speed_test_data(self):
         """Run actual speed test
 
+        NOTE: Creating the SpeedTest client means downloading config and 
+              server list. So we wait until the first speed test (i.e. the 
+              network may not be up yet when the app starts at boot), and 
+              then only refresh the client once in a while. If a refresh 
+              fails, then we keep using the current client and try again
+              before the next speed test.
+
+              Finding the best server means checking latency for several 
+              servers, and the best server rarely changes. So we only do 
+              that once in a while. In between, we only check latency for
+              the current best server as that's also our 'ping' value.
+
         Returns:
             'dict' with all SpeedTest data
+
+        Raises:
+            'speedtest.SpeedtestException' if speed test fails
         """
-        self._client.get_best_server()
+        timeCurrent = time.monotonic()
+        if self._client is None or (timeCurrent - self._clientTime) > APP_SPEEDTEST_CLIENT_TTL:
+            try:
+                client = speedtest.Speedtest(secure=True)
+
+            except speedtest.SpeedtestException:
+                if self._client is None:
+                    raise
+
+            else:
+                self._client = client
+                self._clientTime = timeCurrent
+                self._bestServerTime = None
+
+        if self._bestServerTime is None or (timeCurrent - self._bestServerTime) > APP_BEST_SERVER_TTL:
+            self._client.get_best_server()
+            self._bestServerTime = timeCurrent
+        else:
+            self._client.get_best_server([self._client.best])
+
         self._client.download()
         self._client.upload()
 
         return self._client.results.dict()
 
 
+class BackgroundTask:
+    """Run function in background thread
+
+    Speed tests can take a while, so we run them in the background to keep 
+    the terminal UI and LED responsive. This is a minimal alternative to 
+    'concurrent.futures' that uses a 'daemon' thread. That way the app can
+    exit right away (e.g. on CTRL-C) even if a speed test is still running.
+    """
+    def __init__(self, fn):
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(fn,), daemon=True)
+        self._thread.start()
+
+    def _run(self, fn):
+        try:
+            self._result = fn()
+        except Exception as e:
+            self._error = e
+
+    def done(self):
+        """Check if function has finished"""
+        return not self._thread.is_alive()
+
+    def result(self):
+        """Get function result, or raise error from function"""
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class AdafruitGroup:
+    """Wrapper class for Adafruit IO feed group
+
+    Adafruit IO can accept data for several feeds in the same group with
+    a single request. We use this wrapper to upload all speed test data in 
+    one go, rather than sending one request per feed.
+
+    NOTE: The Adafruit IO client does not (yet) offer a public method for
+          sending group data. So we use its internal '_post()' method,
+          which also takes care of raising 'RequestError' and 
+          'ThrottlingError' as needed.
+
+    NOTE: '_post()' makes a blocking 'requests' call. So 'send_data()' is a
+          regular (blocking) method and not 'async', and it does not run 
+          concurrently with anything else.
+    """
+    def __init__(self, client, groupKey, feedKeys):
+        """Initialize group and verify that it exists and has all feeds
+
+        Args:
+            client: Adafruit IO client
+            groupKey: Adafruit IO group key
+            feedKeys: 'dict' with data type (e.g. 'download') and feed key pairs
+
+        Raises:
+            'RequestError' if group does not exist
+            'ValueError' if any feed is not in the group
+        """
+        group = client.groups(groupKey)
+        groupFeeds = {feed.key for feed in group.feeds or []}
+
+        # Feeds are identified by their key within the group 
+        # (e.g. 'download' rather than 'sysmon.download')
+        self._feedKeys = {}
+        for key, val in feedKeys.items():
+            if not val:
+                continue
+            feedKey = val.removeprefix(f'{groupKey}.')
+            if f'{groupKey}.{feedKey}' not in groupFeeds:
+                raise ValueError(f"Feed '{val}' is not in group '{groupKey}'")
+            self._feedKeys[key] = feedKey
+
+        self._client = client
+        self._groupKey = groupKey
+
+    def send_data(self, data):
+        """Send data for all feeds in the group in a single request
+
+        NOTE: This is a blocking call (see class notes).
+
+        Args:
+            data: 'dict' with data type (e.g. 'download') and value pairs
+        """
+        feeds = [
+            {'key': self._feedKeys[key], 'value': val} 
+            for key, val in data.items() 
+            if key in self._feedKeys and val is not None
+        ]
+        return self._client._post(f'groups/{self._groupKey}/data', {'feeds': feeds})
+
+
 class AppRT(f451Common.Runtime):
     """Application runtime object.
     
@@ -147,6 +297,24 @@ class AppRT(f451Common.Runtime):
             platform.node(),        # Get device 'hostname'
             Path(__file__).parent   # Find dir for this app
         )
+
+    # NOTE: Device ID and serial number do not change while the app is 
+    #       running. But looking them up means reading system files and/or 
+    #       running system commands. So we only do that once when needed.
+    @cached_property
+    def rpiID(self):
+        """Raspberry Pi device ID"""
+        return f451Common.get_RPI_ID(f451Common.DEF_ID_PREFIX)
+
+    @cached_property
+    def rpiSerial(self):
+        """Raspberry Pi serial number"""
+        return f451Common.get_RPI_serial_num()
+
+    @property
+    def wifiStatus(self):
+        """Current Wi-Fi status (can change while app is running)"""
+        return f451Common.STATUS_YES if f451Common.check_wifi() else f451Common.STATUS_UNKNOWN
         
     def _init_log_settings(self, cliArgs):
         """Helper for setting logger settings"""
@@ -182,21 +350,32 @@ class AppRT(f451Common.Runtime):
         self.ioDelay = self.config.get(const.KWD_DELAY, const.DEF_DELAY)
         self.ioWait = max(self.config.get(const.KWD_WAIT, const.DEF_WAIT), APP_MIN_SPEEDTEST_WAIT)
         self.ioThrottle = self.config.get(const.KWD_THROTTLE, const.DEF_THROTTLE)
+        self.ioThrottleBase = self.config.get(const.KWD_THROTTLE_BASE, const.DEF_THROTTLE_BASE)
         self.ioRounding = self.config.get(const.KWD_ROUNDING, const.DEF_ROUNDING)
+        self.ioUploadDelta = self.config.get(const.KWD_UPLOAD_DELTA, const.DEF_UPLOAD_DELTA)
         self.ioUploadAndExit = False
+        self.feedGroup = None
+        self.services = {}              # Cloud service (e.g. Adafruit IO) shared by all its feeds
 
         # Initialize log file/level
         self._init_log_settings(cliArgs)
 
-        # Initialize various counters, etc.
+        # Initialize various counters, etc. We use 'monotonic' time for all 
+        # interval math, so that it's not affected by system clock changes.
         self.timeSinceUpdate = float(0)
-        self.timeUpdate = time.time()
+        self.timeUpdate = time.monotonic()
         self.displayUpdate = self.timeUpdate
         self.uploadDelay = self.ioDelay
-        self.maxUploads = int(cliArgs.uploads)
+        self.maxUploads = cliArgs.uploads
         self.numUploads = 0
+        self.numThrottled = 0           # Number of 'ThrottlingError' in a row
+        self.lastUpload = None          # Last uploaded value for each data type
         self.loopWait = APP_WAIT_1SEC   # Wait time between main loop cycles
 
+        # We reuse a single event loop for all uploads, rather 
+        # than creating a new one with 'asyncio.run()' each time.
+        self.loop = asyncio.new_event_loop()
+
         # Initialize UI for terminal
         if cliArgs.noCLI:
             self.console = Console() # type: ignore
@@ -221,26 +400,28 @@ class AppRT(f451Common.Runtime):
 
         self.console.rule('Config Settings', style='grey', align='center')
 
-        self.logger.log_debug(f"DISPL ROT:   {self.sensors['SenseHat'].displRotation}")
-        self.logger.log_debug(f"DISPL MODE:  {self.sensors['SenseHat'].displMode}")
-        self.logger.log_debug(f"DISPL PROGR: {self.sensors['SenseHat'].displProgress}")
-        self.logger.log_debug(f"SLEEP TIME:  {self.sensors['SenseHat'].displSleepTime}")
-        self.logger.log_debug(f"SLEEP MODE:  {self.sensors['SenseHat'].displSleepMode}")
-
-        self.logger.log_debug(f'IO DEL:      {self.ioDelay}')
-        self.logger.log_debug(f'IO WAIT:     {self.ioWait}')
-        self.logger.log_debug(f'IO THROTTLE: {self.ioThrottle}')
-
-        # Display Raspberry Pi serial and Wi-Fi status
-        self.logger.log_debug(f'Raspberry Pi serial: {f451Common.get_RPI_serial_num()}')
-        self.logger.log_debug(
-            f'Wi-Fi: {(f451Common.STATUS_YES if f451Common.check_wifi() else f451Common.STATUS_UNKNOWN)}'
-        )
+        # Collect all settings and log them in one go
+        sense = self.sensors['SenseHat']
+        lines = [
+            f'DISPL ROT:   {sense.displRotation}',
+            f'DISPL MODE:  {sense.displMode}',
+            f'DISPL PROGR: {sense.displProgress}',
+            f'SLEEP TIME:  {sense.displSleepTime}',
+            f'SLEEP MODE:  {sense.displSleepMode}',
+            f'IO DEL:      {self.ioDelay}',
+            f'IO WAIT:     {self.ioWait}',
+            f'IO THROTTLE: {self.ioThrottle}',
+            f'IO THR BASE: {self.ioThrottleBase}',
+            f'IO DELTA:    {self.ioUploadDelta}',
+            f'Raspberry Pi serial: {self.rpiSerial}',   # Display Raspberry Pi serial
+            f'Wi-Fi: {self.wifiStatus}',                # ... and Wi-Fi status
+        ]
 
         # List CLI args
         if cli:
-            for key, val in vars(cli).items():
-                self.logger.log_debug(f"CLI Arg '{key}': {val}")
+            lines.extend(f"CLI Arg '{key}': {val}" for key, val in vars(cli).items())
+
+        self.logger.log_debug('\n'.join(lines))
 
         # List config settings
         self.console.rule('CONFIG', style='grey', align='center')  # type: ignore
@@ -265,9 +446,11 @@ class AppRT(f451Common.Runtime):
         """
         print()
         self.console.rule(f'{self.appName} (v{self.appVersion})', style='grey', align='center')  # type: ignore
-        print(f'Work start:  {self.workStart:%a %b %-d, %Y at %-I:%M:%S %p}')
-        print(f'Work end:    {(datetime.now()):%a %b %-d, %Y at %-I:%M:%S %p}')
-        print(f'Num uploads: {self.numUploads}')
+        print(
+            f'Work start:  {self.workStart:{APP_TIME_FMT}}\n'
+            f'Work end:    {datetime.now():{APP_TIME_FMT}}\n'
+            f'Num uploads: {self.numUploads}'
+        )
 
         # Show config info, etc. if in 'debug' mode
         if self.debugMode:
@@ -278,13 +461,26 @@ class AppRT(f451Common.Runtime):
         return self.sensors[sensorName]
 
     def add_feed(self, feedName, feedService, feedKey):
-        service = feedService(self.config)
+        if feedService not in self.services:
+            self.services[feedService] = feedService(self.config)
+
+        service = self.services[feedService]
         feed = service.feed_info(feedKey)
 
         self.feeds[feedName] = f451Cloud.AdafruitFeed(service, feed)
 
         return self.feeds[feedName]
 
+    def add_feed_group(self, groupKey, feedKeys):
+        # Reuse the Adafruit IO client behind our feeds. But 'AdafruitCloud' 
+        # does not offer public access to it, so we create our own client 
+        # if we have to.
+        client = getattr(self.services.get(f451Cloud.AdafruitCloud), '_aio', None) or Client(
+            self.config.get(const.KWD_AIO_ID), self.config.get(const.KWD_AIO_KEY)
+        )
+        self.feedGroup = AdafruitGroup(client, groupKey, feedKeys)
+        return self.feedGroup
+
     def update_action(self, cliUI, msg=None):
         """Wrapper to help streamline code"""
         if cliUI:
@@ -295,21 +491,36 @@ class AppRT(f451Common.Runtime):
         if cliUI:
             self.console.update_progress(prog, msg) # type: ignore        
 
+    def wall_time(self, monoTime):
+        """Convert 'monotonic' time stamp to wall-clock time for display"""
+        return time.time() - (time.monotonic() - monoTime)
+
     def update_upload_status(self, cliUI, lastTime, lastStatus):
         """Wrapper to help streamline code"""
         if cliUI:
             self.console.update_upload_status(      # type: ignore
-                lastTime, 
+                self.wall_time(lastTime), 
                 lastStatus, 
-                lastTime + self.uploadDelay, 
+                self.wall_time(lastTime + self.uploadDelay), 
                 self.numUploads, 
                 self.maxUploads
             )
 
-    def update_data(self, cliUI, data):
+    def update_upload_next(self, cliUI, nextTime):
         """Wrapper to help streamline code"""
         if cliUI:
-            self.console.update_data(data) # type: ignore
+            self.console.update_upload_next(self.wall_time(nextTime))  # type: ignore
+
+    def update_data(self, cliUI, data):
+        """Wrapper to help streamline code
+
+        NOTE: We only prep the data for the terminal UI when it's 
+              actually in use, as this happens on every loop cycle.
+        """
+        if cliUI:
+            self.console.update_data(                                       # type: ignore
+                f451CLIUI.prep_data(data.as_dict(), APP_DATA_TYPES, APP_DELTA_FACTOR)
+            )
 
 # Define app runtime object
 appRT = AppRT(APP_NAME, APP_VERSION, APP_NAME_SHORT, APP_LOG, APP_SETTINGS)
@@ -319,6 +530,88 @@ appRT = AppRT(APP_NAME, APP_VERSION, APP_NAME_SHORT, APP_LOG, APP_SETTINGS)
 # =========================================================
 #              H E L P E R   F U N C T I O N S
 # =========================================================
+def get_changed(newData, oldData, deltaFactor):
+    """Get data values that have changed by more than 'deltaFactor'
+
+    Args:
+        newData: 'dict' with new data values
+        oldData: 'dict' with old data values (or 'None' if no old data)
+        deltaFactor: any change within X% is considered negligable. If 
+                     '0', then all new data values are returned.
+
+    Returns:
+        'dict' with new data values that have changed (empty if none)
+    """
+    if not oldData or deltaFactor <= 0:
+        return dict(newData)
+
+    return {
+        key: newVal
+        for key, newVal in newData.items()
+        if (oldVal := oldData.get(key)) is None or abs(newVal - oldVal) > abs(oldVal) * deltaFactor
+    }
+
+
+def data_to_str(data, sentData=None):
+    """Format data values for log messages
+
+    Args:
+        data: 'dict' with data type (e.g. 'download') and value pairs
+        sentData: (optional) 'dict' with data that was uploaded. Any other 
+                  values in 'data' are marked as 'not sent'.
+
+    Returns:
+        'str' with data values (e.g. 'DWN: 10.5 - UP: 3.2 - PING: 12.0')
+    """
+    return ' - '.join(
+        f'{label}: {data[key]}' + ('' if sentData is None or key in sentData else ' (not sent)')
+        for key, label in APP_DATA_LABELS.items()
+        if key in data
+    )
+
+
+def is_not_found(err):
+    """Check if Adafruit IO 'RequestError' is a '404 Not Found' error
+
+    NOTE: 'RequestError' does not keep the HTTP status code. But it's part 
+          of the error message (e.g. 'Adafruit IO request failed: 404 ...').
+
+    Args:
+        err: 'RequestError' from Adafruit IO client
+
+    Returns:
+        'bool' if 'True' then requested item (e.g. group or feed) was not found
+    """
+    return ' 404 ' in f' {err} '
+
+
+async def send_with_retry(sendFn, data, attempts=APP_UPLOAD_ATTEMPTS):
+    """Send data and retry on network errors.
+
+    Brief network blips (e.g. dropped connection or timeout) are retried 
+    right away, as any wait here would also freeze the UI and LED. If the 
+    last attempt also fails, then the error is raised to the caller.
+
+    NOTE: We do not retry on 'ThrottlingError' as that would only use up 
+          more of the same rate limit. Instead the caller increases the 
+          delay until next upload.
+
+    Args:
+        sendFn: function (e.g. 'send_data' of feed) to send data, can be
+                'async' or regular (blocking) function
+        data: data to send
+        attempts: max number of attempts
+    """
+    for attempt in range(attempts):
+        try:
+            result = sendFn(data)
+            return await result if inspect.isawaitable(result) else result
+
+        except (NetworkError, NetworkTimeout):
+            if attempt + 1 >= attempts:
+                raise
+
+
 async def upload_speedtest_data(app, *args, **kwargs):
     """Send sensor data to cloud services.
 
@@ -340,73 +633,57 @@ async def upload_speedtest_data(app, *args, **kwargs):
     # We combine 'args' and 'kwargs' to allow users to provide a 'dict' with
     # all data points and/or individual data points (which could override
     # values in the 'dict').
-    data = {**args[0], **kwargs} if args and isinstance(args[0], dict) else kwargs
-
-    sendQ = []
-
-    # Send download speed data?
-    if data.get(const.KWD_DATA_DWNLD) is not None:
-        sendQ.append(app.feeds[const.KWD_DATA_DWNLD].send_data(data.get(const.KWD_DATA_DWNLD)))  # type: ignore
-
-    # Send upload speed data?
-    if data.get(const.KWD_DATA_UPLD) is not None:
-        sendQ.append(app.feeds[const.KWD_DATA_UPLD].send_data(data.get(const.KWD_DATA_UPLD)))  # type: ignore
-
-    # Send ping response data?
-    if data.get(const.KWD_DATA_PING) is not None:
-        sendQ.append(app.feeds[const.KWD_DATA_PING].send_data(data.get(const.KWD_DATA_PING)))  # type: ignore
-
-    # deviceID = SENSE_HAT.get_ID(DEF_ID_PREFIX)
-
-    await asyncio.gather(*sendQ)
+    data = args[0] | kwargs if args and isinstance(args[0], dict) else kwargs
 
+    # Send all data in a single request if we have a feed group. If the group 
+    # or any of its feeds no longer exist, then we fall back to sending data 
+    # to each feed for the rest of the session. Any other 'RequestError' is 
+    # raised to the caller, and we try the group again at next upload.
+    if app.feedGroup is not None:
+        try:
+            await send_with_retry(app.feedGroup.send_data, data)
+            return
 
-def btn_up(event):
-    """SenseHat Joystick UP event
+        except RequestError as e:
+            if not is_not_found(e):
+                raise
+            app.logger.log_error(f'Group upload failed, using single feeds: {e}')
+            app.feedGroup = None
 
-    Rotate display by -90 degrees and reset screen blanking
-    """
-    global appRT
+    # Send data for each data type (i.e. download speed, upload 
+    # speed, and ping response time) that has a value
+    sendQ = [
+        send_with_retry(app.feeds[key].send_data, val)  # type: ignore
+        for key in APP_DATA_TYPES 
+        if (val := data.get(key)) is not None
+    ]
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].display_rotate(-1)
-        appRT.displayUpdate = time.time()
+    # No need for 'gather()' unless we have several uploads
+    if len(sendQ) > 1:
+        await asyncio.gather(*sendQ)
+    elif sendQ:
+        await sendQ[0]
 
 
-def btn_down(event):
-    """SenseHat Joystick DOWN event
+def joystick_action(action):
+    """Create SenseHat Joystick event handler
 
-    Rotate display by +90 degrees and reset screen blanking
-    """
-    global appRT
+    The UP, DOWN, LEFT, and RIGHT events all work the same way. We 
+    run an action on the Sense HAT and reset screen blanking.
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].display_rotate(1)
-        appRT.displayUpdate = time.time()
-
-
-def btn_left(event):
-    """SenseHat Joystick LEFT event
+    Args:
+        action: function to call with SenseHat object as argument
 
-    Switch display mode by 1 mode and reset screen blanking
+    Returns:
+        joystick event handler
     """
-    global appRT
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].set_display_mode(-1)
-        appRT.displayUpdate = time.time()
-
-
-def btn_right(event):
-    """SenseHat Joystick RIGHT event
-
-    Switch display mode by 1 mode and reset screen blanking
-    """
-    global appRT
+    def _handler(event):
+        if event.action != f451SenseHat.BTN_RELEASE:
+            action(appRT.sensors['SenseHat'])
+            appRT.displayUpdate = time.monotonic()
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].set_display_mode(1)
-        appRT.displayUpdate = time.time()
+    return _handler
 
 
 def btn_middle(event):
@@ -420,18 +697,20 @@ def btn_middle(event):
         # Wake up?
         if appRT.sensors['SenseHat'].displSleepMode:
             appRT.sensors['SenseHat'].update_sleep_mode(False)
-            appRT.displayUpdate = time.time()
+            appRT.displayUpdate = time.monotonic()
         else:
             appRT.sensors['SenseHat'].update_sleep_mode(True)
 
 
+# fmt: off
 APP_JOYSTICK_ACTIONS = {
-    f451SenseHat.KWD_BTN_UP: btn_up,
-    f451SenseHat.KWD_BTN_DWN: btn_down,
-    f451SenseHat.KWD_BTN_LFT: btn_left,
-    f451SenseHat.KWD_BTN_RHT: btn_right,
-    f451SenseHat.KWD_BTN_MDL: btn_middle,
+    f451SenseHat.KWD_BTN_UP: joystick_action(lambda sense: sense.display_rotate(-1)),    # Rotate display by -90 degrees
+    f451SenseHat.KWD_BTN_DWN: joystick_action(lambda sense: sense.display_rotate(1)),    # Rotate display by +90 degrees
+    f451SenseHat.KWD_BTN_LFT: joystick_action(lambda sense: sense.set_display_mode(-1)), # Switch to prev display mode
+    f451SenseHat.KWD_BTN_RHT: joystick_action(lambda sense: sense.set_display_mode(1)),  # Switch to next display mode
+    f451SenseHat.KWD_BTN_MDL: btn_middle,                                                # Turn display on/off
 }
+# fmt: on
 
 
 def update_SenseHat_LED(sense, data, colors=None):
@@ -458,25 +737,18 @@ def update_SenseHat_LED(sense, data, colors=None):
     def _get_color_map(data, colors=None):
         return f451Common.get_tri_colors(colors, True) if all(data.limits) else None
 
-    # Check display mode. Each mode corresponds to a data type
-    # Show dowload speed?
-    if sense.displMode == const.DISPL_DWNLD:
-        minMax = _minMax(data.download.as_tuple().data)
-        dataClean = f451SenseHat.prep_data(data.download.as_tuple())
-        colorMap = _get_color_map(dataClean, colors)
-        sense.display_as_graph(dataClean, minMax, colorMap)
-
-    # Show upload speed?
-    elif sense.displMode == const.DISPL_UPLD:
-        minMax = _minMax(data.upload.as_tuple().data)
-        dataClean = f451SenseHat.prep_data(data.upload.as_tuple())
-        colorMap = _get_color_map(dataClean, colors)
-        sense.display_as_graph(dataClean, minMax, colorMap)
-
-    # Show ping response time?
-    elif sense.displMode == const.DISPL_PING:
-        minMax = _minMax(data.ping.as_tuple().data)
-        dataClean = f451SenseHat.prep_data(data.ping.as_tuple())
+    # Check display mode. Each mode corresponds to a data type (e.g. download
+    # speed, upload speed, or ping response time), and we show the data as a
+    # graph. Any other mode (e.g. 'sparkles') has no data series.
+    #
+    # NOTE: The LED can only show the last 'widthLED' data points, 
+    #       so we only prep (i.e. validate) that slice of the data.
+    #
+    dataType = APP_DISPL_DATA.get(sense.displMode)
+    if dataType is not None:
+        series = getattr(data, dataType).as_tuple()
+        minMax = _minMax(series.data)
+        dataClean = f451SenseHat.prep_data(series, sense.widthLED)
         colorMap = _get_color_map(dataClean, colors)
         sense.display_as_graph(dataClean, minMax, colorMap)
 
@@ -538,7 +810,7 @@ def init_cli_parser(appName, appVersion, setDefaults=True):
     # fmt: on
 
 
-def collect_data(app, data, timeCurrent, cliUI=False):
+def collect_data(app, data, speedData, timeCurrent, cliUI=False):
     """Collect data from sensors.
 
     This is core of the application where we collect data from
@@ -547,6 +819,7 @@ def collect_data(app, data, timeCurrent, cliUI=False):
     Args:
         app: application runtime object with config, counters, etc.
         data: main application data queue
+        speedData: 'dict' with results from speed test
         timeCurrent: time stamp from when loop started
         cliUI: 'bool' to indicate if we use full (console) UI
 
@@ -557,65 +830,96 @@ def collect_data(app, data, timeCurrent, cliUI=False):
 
     # --- Get speed data ---
     #
-    app.update_action(cliUI, 'Running speed test …')
-
-    speedData = app.sensors['SpeedTest'].get_speed_test_data()
-    dwnld = speedData[const.KWD_DATA_DWNLD] / const.MBITS_PER_SEC
-    upld = speedData[const.KWD_DATA_UPLD] / const.MBITS_PER_SEC
+    dwnld = speedData[const.KWD_DATA_DWNLD] * const.MBITS_FACTOR
+    upld = speedData[const.KWD_DATA_UPLD] * const.MBITS_FACTOR
     ping = speedData[const.KWD_DATA_PING]
     #
     # ----------------------
 
-    # Is it time to upload data?
+    # Round values once for upload, log, and check for changes
+    dwnldR = round(dwnld, app.ioRounding)
+    upldR = round(upld, app.ioRounding)
+    pingR = round(ping, app.ioRounding)
+    uploadData = {
+        const.KWD_DATA_DWNLD: dwnldR,
+        const.KWD_DATA_UPLD: upldR,
+        const.KWD_DATA_PING: pingR,
+    }
+
+    # Is it time to upload data? We only upload values that have changed (much) 
+    # since they were last uploaded. And if nothing has changed, then we skip 
+    # this upload and wait another full upload cycle.
+    #
+    # NOTE: We never skip uploads when there is a max number of uploads, as 
+    #       skipped uploads do not count and the app could then run forever.
     if app.timeSinceUpdate >= app.uploadDelay:
-        try:
-            asyncio.run(
-                upload_speedtest_data(
-                    app,
-                    {
-                        const.KWD_DATA_DWNLD: round(dwnld, app.ioRounding),
-                        const.KWD_DATA_UPLD: round(upld, app.ioRounding),
-                        const.KWD_DATA_PING: round(ping, app.ioRounding),
-                    },
-                    deviceID=f451Common.get_RPI_ID(f451Common.DEF_ID_PREFIX),
-                )
-            )
+        if app.maxUploads > 0:
+            changedData = uploadData
+        else:
+            changedData = get_changed(uploadData, app.lastUpload, app.ioUploadDelta)
 
-        except RequestError as e:
-            app.logger.log_error(f'Application terminated: {e}')
-            sys.exit(1)
+        if not changedData:
+            # Nothing was sent, so any throttling backoff does not carry over
+            app.timeUpdate = timeCurrent
+            app.numThrottled = 0
+            app.uploadDelay = app.ioFreq
+            app.logger.log_info(f'Skipped upload: {data_to_str(uploadData)}')
+            app.update_upload_next(cliUI, timeCurrent + app.uploadDelay)
 
-        except ThrottlingError as e:
-            # Keep increasing 'ioDelay' each time we get a 'ThrottlingError'
-            app.uploadDelay += app.ioThrottle
-            app.logger.log_error(f'Throttling error: {e}')
+        else:
+            try:
+                app.loop.run_until_complete(
+                    upload_speedtest_data(app, changedData, deviceID=app.rpiID)
+                )
 
-        except KeyboardInterrupt:
-            exitApp = True
+            except RequestError as e:
+                # Group upload errors may be temporary (e.g. server or auth 
+                # errors), so we try again at next upload. But errors with 
+                # single feeds still end the app.
+                if app.feedGroup is None:
+                    app.logger.log_error(f'Application terminated: {e}')
+                    sys.exit(1)
+                app.logger.log_error(f'Group upload failed: {e}')
+
+            except ThrottlingError as e:
+                # Keep increasing 'uploadDelay' each time we get a 'ThrottlingError'. The 
+                # additional delay grows by 'ioThrottleBase' for each error in a row.
+                app.uploadDelay = min(
+                    app.uploadDelay + app.ioThrottle * app.ioThrottleBase**app.numThrottled,
+                    max(app.ioFreq, APP_MAX_UPLOAD_DELAY),
+                )
+                app.numThrottled += 1
+                app.logger.log_error(f'Throttling error: {e}')
 
-        else:
-            # Reset 'uploadDelay' back to normal 'ioFreq' on successful upload
-            app.numUploads += 1
-            app.uploadDelay = app.ioFreq
-            exitApp = exitApp or app.ioUploadAndExit
-            app.logger.log_info(
-                f'Uploaded: DWN: {round(dwnld, app.ioRounding)} - UP: {round(upld, app.ioRounding)} - PING: {round(ping, app.ioRounding)}'
-            )
-            app.update_upload_status(cliUI, timeCurrent, f451CLIUI.HTTP_STATUS_OK)
+            except (NetworkError, NetworkTimeout) as e:
+                # Network is (still) down after several attempts. We'll 
+                # just try again at next upload.
+                app.logger.log_error(f'Network error: {e}')
 
-        finally:
-            app.timeUpdate = timeCurrent
-            exitApp = (app.maxUploads > 0) and (app.numUploads >= app.maxUploads)
-            app.update_action(cliUI, None)
+            except KeyboardInterrupt:
+                exitApp = True
 
-    # Update data set and display to terminal as needed
+            else:
+                # Reset 'uploadDelay' back to normal 'ioFreq' on successful upload
+                app.numUploads += 1
+                app.numThrottled = 0
+                app.uploadDelay = app.ioFreq
+                app.lastUpload = (app.lastUpload or {}) | changedData
+                exitApp = exitApp or app.ioUploadAndExit
+                app.logger.log_info(f'Uploaded: {data_to_str(uploadData, changedData)}')
+                app.update_upload_status(cliUI, timeCurrent, f451CLIUI.HTTP_STATUS_OK)
+
+            finally:
+                app.timeUpdate = timeCurrent
+                exitApp = exitApp or (0 < app.maxUploads <= app.numUploads)
+                app.update_action(cliUI, None)
+
+    # Update data set. The main loop will refresh the
+    # terminal UI and Sense HAT LED right after this.
     data.download.data.append(dwnld)
     data.upload.data.append(upld)
     data.ping.data.append(ping)
 
-    update_SenseHat_LED(app.sensors['SenseHat'], data)
-    app.update_data(cliUI, f451CLIUI.prep_data(data.as_dict(), APP_DATA_TYPES, APP_DELTA_FACTOR))
-
     return exitApp
 
 
@@ -631,52 +935,109 @@ def main_loop(app, data, cliUI=False):
         data: main application data queue
         cliUI: 'bool' to indicate if we use full (console) UI
     """
-    # Set 'wait' counter 'exit' flag and start the loop!
+    # Grab Sense HAT and its sleep time once, as neither changes while we 
+    # loop. But display mode, sleep mode, etc. can change via joystick.
+    sense = app.sensors['SenseHat']
+    sleepTime = sense.displSleepTime
+
+    # Set 'exit' flag and deadlines for next sensor read and next loop 
+    # cycle, and start the loop!
     exitApp = False
-    waitForSensor = 0
+    speedTest = None
+    nextSensorRead = nextLoopTick = time.monotonic()
+
+    # Track what's shown on the LED, so we only redraw graphs and 
+    # progress bar when needed
+    numSamples = 0
+    ledState = None
+    progLen = None
 
     while not exitApp:
         try:
             # fmt: off
-            timeCurrent = time.time()
+            timeCurrent = time.monotonic()
             app.timeSinceUpdate = timeCurrent - app.timeUpdate
-            app.sensors['SenseHat'].update_sleep_mode(
-                (timeCurrent - app.displayUpdate) > app.sensors['SenseHat'].displSleepTime, # Time to sleep?
-                # cliArgs.noLED,                                                            # Force no LED?
-                app.sensors['SenseHat'].displSleepMode                                      # Already asleep?
+            sense.update_sleep_mode(
+                (timeCurrent - app.displayUpdate) > sleepTime,  # Time to sleep?
+                # cliArgs.noLED,                                # Force no LED?
+                sense.displSleepMode                            # Already asleep?
             )
             # fmt: on
 
-            # Update Sense HAT prog bar as needed
-            app.sensors['SenseHat'].display_progress(app.timeSinceUpdate / app.uploadDelay)
+            # Is speed test running in the background? If it's done, then we 
+            # can process the results. If it failed (e.g. network is down), 
+            # then we skip this round and try again after next wait.
+            if speedTest is not None:
+                if speedTest.done():
+                    app.update_action(cliUI, None)
+                    try:
+                        speedData = speedTest.result()
+
+                    except speedtest.SpeedtestException as e:
+                        app.logger.log_error(f'Speed test failed: {e}')
+
+                    else:
+                        exitApp = collect_data(app, data, speedData, timeCurrent, cliUI)
+                        numSamples += 1
+
+                    speedTest = None
+                    nextSensorRead = time.monotonic() + max(app.ioWait, APP_MIN_PROG_WAIT)
+                    if app.ioWait > APP_MIN_PROG_WAIT:
+                        app.update_progress(cliUI, None, 'Waiting for speed test')
 
             # Do we need to wait for next sensor read?
-            if waitForSensor > 0:
+            elif nextSensorRead > timeCurrent:
+                waitForSensor = nextSensorRead - timeCurrent
                 app.update_progress(cliUI, int((1 - waitForSensor / app.ioWait) * 100))
 
             # ... or can we collect more 'specimen'? :-P
             else:
-                app.update_action(cliUI, None)
-                exitApp = collect_data(app, data, timeCurrent, cliUI)
-                waitForSensor = max(app.ioWait, APP_MIN_PROG_WAIT)
-                if app.ioWait > APP_MIN_PROG_WAIT:
-                    app.update_progress(cliUI, None, 'Waiting for speed test')
+                app.update_action(cliUI, 'Running speed test …')
+                speedTest = BackgroundTask(app.sensors['SpeedTest'].get_speed_test_data)
 
             # Update UI and SenseHAT LED as needed even when we're just waiting for 
-            # next upload. This means that more sparkles are generated as well
-            app.update_data(
-                cliUI, f451CLIUI.prep_data(data.as_dict(), APP_DATA_TYPES, APP_DELTA_FACTOR)
+            # next upload. This means that more sparkles are generated as well. But
+            # graphs are only redrawn when there is new data, or when display mode,
+            # rotation, or sleep mode has changed. 
+            #
+            # We update the prog bar last, so that it's drawn on top of the graph. 
+            # And we only redraw it when the graph was redrawn, or when the bar 
+            # length changes. If the bar gets shorter, then we also redraw the 
+            # graph so that no part of the old (longer) bar is left behind.
+            app.update_data(cliUI, data)
+
+            progFrac = app.timeSinceUpdate / app.uploadDelay
+            newProgLen = int(sense.widthLED * progFrac)
+            newLedState = (sense.displMode, sense.displRotation, sense.displSleepMode, numSamples)
+            isRedraw = (
+                sense.displMode not in APP_DISPL_MODES 
+                or newLedState != ledState 
+                or (progLen is not None and newProgLen < progLen)
             )
-            update_SenseHat_LED(app.sensors['SenseHat'], data)
-            app.sensors['SenseHat'].display_progress(app.timeSinceUpdate / app.uploadDelay)
+            if isRedraw:
+                update_SenseHat_LED(sense, data)
+                ledState = newLedState
+
+            if isRedraw or newProgLen != progLen:
+                sense.display_progress(progFrac)
+                progLen = newProgLen
 
         except KeyboardInterrupt:
             exitApp = True
 
-        # Are we done?
+        # Are we done? If not, then sleep until next loop cycle. Loop cycles 
+        # are 'loopWait' apart regardless of how long each cycle took, but we 
+        # never try to catch up on missed cycles. We also wake up early if 
+        # that's when the next sensor read is due, and then the pending loop
+        # cycle is still due at its original time.
         if not exitApp:
-            time.sleep(app.loopWait)
-            waitForSensor -= app.loopWait
+            timeNow = time.monotonic()
+            if timeNow >= nextLoopTick + app.loopWait:
+                nextLoopTick = timeNow + app.loopWait
+            elif timeNow >= nextLoopTick:
+                nextLoopTick += app.loopWait
+            wakeUp = nextLoopTick if speedTest is not None else min(nextLoopTick, nextSensorRead)
+            time.sleep(max(0, wakeUp - timeNow))
 
 
 # =========================================================
@@ -709,6 +1070,10 @@ def main(cliArgs=None):  # sourcery skip: extract-method
         cli.print_help(sys.stdout)
         sys.exit(0)
 
+    # Capturing local vars for every frame in a traceback
+    # is costly, so we only do that in 'debug' mode.
+    install_rich_traceback(show_locals=cliArgs.debug)
+
     if cliArgs.version:
         print(f'{APP_NAME} (v{APP_VERSION})')
         sys.exit(0)
@@ -717,6 +1082,10 @@ def main(cliArgs=None):  # sourcery skip: extract-method
     appData = f451SystemData.SystemData(None, APP_MAX_DATA)
     appRT.init_runtime(cliArgs, appData)
 
+    # 'debug' mode can also be set via log level in 'settings.toml'
+    if appRT.debugMode and not cliArgs.debug:
+        install_rich_traceback(show_locals=True)
+
     # Verify that feeds exist and initialize them
     try:
         appRT.add_feed(
@@ -735,10 +1104,25 @@ def main(cliArgs=None):  # sourcery skip: extract-method
             appRT.config.get(const.KWD_FEED_PING, None),
         )
 
+        # Upload all data in a single request if feeds are in a group
+        if appRT.config.get(const.KWD_FEED_GROUP):
+            appRT.add_feed_group(
+                appRT.config.get(const.KWD_FEED_GROUP),
+                {
+                    const.KWD_DATA_DWNLD: appRT.config.get(const.KWD_FEED_DWNLD, None),
+                    const.KWD_DATA_UPLD: appRT.config.get(const.KWD_FEED_UPLD, None),
+                    const.KWD_DATA_PING: appRT.config.get(const.KWD_FEED_PING, None),
+                },
+            )
+
     except RequestError as e:
         appRT.logger.log_error(f'Application terminated due to REQUEST ERROR: {e}')
         sys.exit(1)
 
+    except ValueError as e:
+        appRT.logger.log_error(f'Application terminated due to INVALID SETTINGS: {e}')
+        sys.exit(1)
+
     try:
         # Initialize device instance which includes all sensors
         # and LED display on Sense HAT. Also initialize joystick
@@ -754,7 +1138,7 @@ def main(cliArgs=None):  # sourcery skip: extract-method
             cliArgs.dmode or appRT.config.get(f451SenseHat.KWD_DISPLAY)
         )
 
-        # Initialize SpeedTest client and add to sensors
+        # Add SpeedTest to sensors. The actual client is created on first test.
         appRT.add_sensor('SpeedTest', SpeedTest)
 
     except KeyboardInterrupt:
@@ -767,13 +1151,19 @@ def main(cliArgs=None):  # sourcery skip: extract-method
     #
     appRT.logger.log_info('-- START Data Logging --')
 
-    with contextlib.suppress(KeyboardInterrupt):
-        if cliArgs.noCLI:
-            main_loop(appRT, appData)
-        else:
-            appRT.console.update_upload_next(appRT.timeUpdate + appRT.uploadDelay)  # type: ignore
-            with Live(appRT.console.layout, screen=True, redirect_stderr=False):  # noqa: F841 # type: ignore
-                main_loop(appRT, appData, True)
+    try:
+        with contextlib.suppress(KeyboardInterrupt):
+            if cliArgs.noCLI:
+                main_loop(appRT, appData)
+            else:
+                appRT.update_upload_next(True, appRT.timeUpdate + appRT.uploadDelay)
+                with Live(appRT.console.layout, screen=True, redirect_stderr=False):  # noqa: F841 # type: ignore
+                    main_loop(appRT, appData, True)
+
+    finally:
+        # Always release event loop, even on errors. Any speed test still
+        # running is in a 'daemon' thread and does not block exit.
+        appRT.loop.close()
 
     appRT.logger.log_info('-- END Data Logging --')
     #
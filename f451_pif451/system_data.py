@@ -7,6 +7,7 @@ system data collected in the 'sysmon' application.
 """
 
 from collections import deque
+from itertools import repeat
 import f451_sensehat.sensehat_data as f451SenseData
 
 
@@ -45,6 +46,9 @@ class SystemData:
         as_list: returns a 'list' with data from each attribute as 'dict'
     """
 
+    # The set of data series is fixed, so no need for instance '__dict__'
+    __slots__ = ('download', 'upload', 'ping')
+
     def __init__(self, defVal, maxLen):
         """Initialize data structurte.
 
@@ -56,21 +60,21 @@ class SystemData:
             'dict' - holds entiure data structure
         """
         self.download = f451SenseData.SenseObject(
-            deque([defVal] * maxLen, maxlen=maxLen),
+            deque(repeat(defVal, maxLen), maxlen=maxLen),
             (None, None),  # min/max range for valid data
             'MB/s',
             [None, None, None, None],
             'Download',
         )
         self.upload = f451SenseData.SenseObject(
-            deque([defVal] * maxLen, maxlen=maxLen),
+            deque(repeat(defVal, maxLen), maxlen=maxLen),
             (None, None),  # min/max range for valid data
             'MB/s',
             [None, None, None, None],
             'Upload',
         )
         self.ping = f451SenseData.SenseObject(
-            deque([defVal] * maxLen, maxlen=maxLen),
+            deque(repeat(defVal, maxLen), maxlen=maxLen),
             (None, None),  # min/max range for valid data
             'ms',
             [None, None, None, None],
@@ -0,0 +1,63 @@
+"""Tests for helper functions in 'sysmon' application."""
+
+import pytest
+
+from f451_pif451 import constants as const
+from f451_pif451.sysmon import data_to_str, get_changed
+
+DWNLD = const.KWD_DATA_DWNLD
+UPLD = const.KWD_DATA_UPLD
+PING = const.KWD_DATA_PING
+
+
+@pytest.fixture
+def old_data():
+    return {DWNLD: 100.0, UPLD: 20.0, PING: 10.0}
+
+
+# =========================================================
+#                    T E S T   C A S E S
+# =========================================================
+@pytest.mark.parametrize('oldData', [None, {}])
+def test_get_changed_without_old_data(oldData):
+    newData = {DWNLD: 100.0, UPLD: 20.0, PING: 10.0}
+    changed = get_changed(newData, oldData, 0.02)
+
+    assert changed == newData
+    assert changed is not newData
+
+
+def test_get_changed_within_delta(old_data):
+    newData = {DWNLD: 101.0, UPLD: 19.8, PING: 10.2}
+    assert get_changed(newData, old_data, 0.02) == {}
+
+
+def test_get_changed_only_returns_changed_values(old_data):
+    newData = {DWNLD: 103.0, UPLD: 20.0, PING: 9.0}
+    assert get_changed(newData, old_data, 0.02) == {DWNLD: 103.0, PING: 9.0}
+
+
+def test_get_changed_with_missing_old_value(old_data):
+    del old_data[PING]
+    newData = {DWNLD: 100.0, UPLD: 20.0, PING: 10.0}
+    assert get_changed(newData, old_data, 0.02) == {PING: 10.0}
+
+
+def test_get_changed_with_zero_old_value():
+    assert get_changed({PING: 0.0}, {PING: 0.0}, 0.02) == {}
+    assert get_changed({PING: 0.1}, {PING: 0.0}, 0.02) == {PING: 0.1}
+
+
+@pytest.mark.parametrize('deltaFactor', [0, -1])
+def test_get_changed_with_no_delta(old_data, deltaFactor):
+    assert get_changed(old_data, old_data, deltaFactor) == old_data
+
+
+def test_data_to_str(old_data):
+    assert data_to_str(old_data) == 'DWN: 100.0 - UP: 20.0 - PING: 10.0'
+
+
+def test_data_to_str_marks_values_not_sent(old_data):
+    assert data_to_str(old_data, {UPLD: 20.0}) == (
+        'DWN: 100.0 (not sent) - UP: 20.0 - PING: 10.0 (not sent)'
+    )